@@ -1,35 +1,294 @@
+import gzip
+import hashlib
 import os
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from functools import wraps
+from itertools import islice
+from operator import itemgetter
 
+import orjson
 import requests
-from flask import Flask, jsonify, render_template, request
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask import Flask, Response, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson for jsonify and request parsing."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 PLEX_URL = os.environ.get("PLEX_URL", "").rstrip("/")
 PLEX_TOKEN = os.environ.get("PLEX_TOKEN", "")
 
-# Simple in-memory cache with TTL
-_cache = {}
 CACHE_TTL = 60  # seconds
+CACHE_MAX_ENTRIES = 512
+SECTION_PAGE_SIZE = 500  # items per paginated /all request
+REDIS_URL = os.environ.get("REDIS_URL", "")
+INDEX_TTL = 24 * 60 * 60  # seconds to keep section/show reverse indexes
+REDIS_RETRY_INTERVAL = 5  # seconds to skip Redis after a failed call
+
+_MISSING = object()
+
+
+class LocalCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        # One LRU per cached function, so filling one (e.g. seasons for every
+        # show in a large section) can't evict another's entries
+        self._entries = {}
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key):
+        """Return the cached value, or _MISSING if absent or expired."""
+        with self._lock:
+            entries = self._entries.get(key[0])
+            entry = entries.get(key) if entries else None
+            if entry is None or entry[1] <= time.monotonic():
+                return _MISSING
+            entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds, evicting the oldest entries."""
+        with self._lock:
+            entries = self._entries.setdefault(key[0], OrderedDict())
+            entries[key] = (value, time.monotonic() + ttl)
+            entries.move_to_end(key)
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+
+    def delete(self, *keys):
+        """Remove the given keys if present."""
+        with self._lock:
+            for key in keys:
+                self._entries.get(key[0], {}).pop(key, None)
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._indexes.clear()
+
+    def acquire_lock(self, name, ttl):
+        """Always succeeds; an in-process cache is only shared within the process."""
+        return True
+
+    def set_index(self, name, mapping):
+        """Replace a reverse index; these outlive the entries they point at."""
+        with self._lock:
+            self._indexes[name] = dict(mapping)
+
+    def get_index(self, name):
+        """Return a reverse index as a dict, empty if unknown."""
+        with self._lock:
+            return dict(self._indexes.get(name, {}))
+
+
+class JSONCodec:
+    """Store a cached value as JSON, optionally rebuilding objects on read."""
+
+    suffixes = ("",)
+
+    def __init__(self, rebuild=None):
+        self._rebuild = rebuild
+
+    def encode(self, value):
+        return [orjson.dumps(value)]
+
+    def decode(self, parts):
+        value = orjson.loads(parts[0])
+        return self._rebuild(value) if self._rebuild else value
+
+
+class RenderedCodec:
+    """Store a rendered (body, etag) pair as raw bytes under two keys."""
+
+    suffixes = ("", ":etag")
+
+    def encode(self, value):
+        body, etag = value
+        return [body, etag.encode()]
+
+    def decode(self, parts):
+        body, etag = parts
+        return body, etag.decode()
+
+
+_default_codec = JSONCodec()
+_codecs = {}  # cached function name -> codec used by RedisCache
+
+
+class RedisCache:
+    """Cache stored in Redis so all workers and replicas share it."""
+
+    def __init__(self, url, prefix="plex"):
+        import redis
+
+        # Fail fast so an unreachable Redis degrades to cache misses
+        self._redis = redis.Redis.from_url(
+            url, socket_connect_timeout=1, socket_timeout=1
+        )
+        self._error = redis.RedisError
+        self._prefix = prefix
+        self._retry_at = 0.0
+
+    def _key(self, key):
+        return ":".join([self._prefix, *map(str, key)])
+
+    def _codec(self, key):
+        return _codecs.get(key[0], _default_codec)
+
+    def _names(self, key):
+        """Return the Redis keys holding a cache entry, one per codec part."""
+        base = self._key(key)
+        return [base + suffix for suffix in self._codec(key).suffixes]
+
+    def _run(self, operation, default=None):
+        """Run a Redis operation, skipping Redis for a while after a failure."""
+        if time.monotonic() < self._retry_at:
+            return default
+        try:
+            return operation(self._redis)
+        except self._error:
+            self._retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+            return default
+
+    def get(self, key):
+        """Return the cached value, or _MISSING if absent, invalid or Redis is down."""
+        parts = self._run(lambda r: r.mget(self._names(key)))
+        if not parts or None in parts:
+            return _MISSING
+        try:
+            return self._codec(key).decode(parts)
+        except (ValueError, TypeError, KeyError):
+            return _MISSING
 
+    def set(self, key, value, ttl):
+        """Store a value for ttl seconds; failures only cost a cache miss."""
+        try:
+            parts = self._codec(key).encode(value)
+        except TypeError:
+            return
 
-def cached(ttl=CACHE_TTL):
+        def store(r):
+            with r.pipeline() as pipe:
+                for name, part in zip(self._names(key), parts):
+                    pipe.setex(name, ttl, part)
+                pipe.execute()
+
+        self._run(store)
+
+    def delete(self, *keys):
+        """Remove the given keys if present; failures leave them to expire."""
+        names = [name for key in keys for name in self._names(key)]
+        if names:
+            self._run(lambda r: r.delete(*names))
+
+    def clear(self):
+        """Remove every entry under this cache's key prefix."""
+        def clear_prefix(r):
+            with r.pipeline() as pipe:
+                for key in r.scan_iter(match=f"{self._prefix}:*"):
+                    pipe.delete(key)
+                pipe.execute()
+
+        self._run(clear_prefix)
+
+    def acquire_lock(self, name, ttl):
+        """Take a lock shared by all workers for ttl seconds, if it is free."""
+        lock = self._key(("lock", name))
+        return bool(self._run(lambda r: r.set(lock, b"1", nx=True, ex=ttl)))
+
+    def set_index(self, name, mapping):
+        """Replace a reverse index, stored as a hash shared by all workers."""
+        key = self._key(("idx", *name))
+
+        def store(r):
+            with r.pipeline() as pipe:
+                pipe.delete(key)
+                if mapping:
+                    pipe.hset(key, mapping=mapping)
+                    pipe.expire(key, INDEX_TTL)
+                pipe.execute()
+
+        self._run(store)
+
+    def get_index(self, name):
+        """Return a reverse index as a dict, empty if unknown or Redis is down."""
+        mapping = self._run(lambda r: r.hgetall(self._key(("idx", *name)))) or {}
+        return {k.decode(): v.decode() for k, v in mapping.items()}
+
+
+def create_cache():
+    """Use Redis when REDIS_URL is set, otherwise an in-process cache."""
+    return RedisCache(REDIS_URL) if REDIS_URL else LocalCache()
+
+
+_cache = create_cache()
+_inflight = {}  # cache_key -> threading.Event for fetches in progress
+_inflight_lock = threading.Lock()
+
+
+def cached(ttl=CACHE_TTL, codec=None):
     """Decorator to cache function results."""
     def decorator(func):
+        _codecs[func.__name__] = codec or _default_codec
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            cache_key = f"{func.__name__}:{args}:{kwargs}"
-            now = time.time()
-
-            if cache_key in _cache:
-                result, timestamp = _cache[cache_key]
-                if now - timestamp < ttl:
-                    return result
-
-            result = func(*args, **kwargs)
-            _cache[cache_key] = (result, now)
+            cache_key = (func.__name__, args)
+            if kwargs:
+                cache_key += (tuple(sorted(kwargs.items())),)
+
+            result = _cache.get(cache_key)
+            if result is not _MISSING:
+                return result
+
+            # Only one caller fetches a missing key; the rest wait for it
+            with _inflight_lock:
+                inflight = _inflight.get(cache_key)
+                is_leader = inflight is None
+                if is_leader:
+                    inflight = _inflight[cache_key] = threading.Event()
+                    inflight.result = inflight.error = None
+
+            if not is_leader:
+                if inflight.wait(timeout=30):
+                    if inflight.error is not None:
+                        raise inflight.error
+                    return inflight.result
+                return func(*args, **kwargs)
+
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                inflight.error = e
+                raise
+            else:
+                inflight.result = result
+                _cache.set(cache_key, result, ttl)
+            finally:
+                with _inflight_lock:
+                    del _inflight[cache_key]
+                inflight.set()
             return result
         return wrapper
     return decorator
@@ -40,75 +299,218 @@ def clear_cache():
     _cache.clear()
 
 
-def plex_request(endpoint, params=None):
-    """Make a request to the Plex API."""
-    if params is None:
-        params = {}
-    params["X-Plex-Token"] = PLEX_TOKEN
+def invalidate_section(section_id, path=None):
+    """Evict cached data for a section, optionally only shows under a path."""
+    keys = [
+        ("fetch_section_items", (section_id,)),
+        ("render_section_items", (section_id,)),
+    ]
+
+    # The reverse indexes outlive the listings, so descendants are still
+    # found after the section entry itself has expired or been evicted
+    shows = _cache.get_index(("section", section_id))
+    for show_id, show_path in shows.items():
+        if path and not (path.startswith(show_path) or show_path.startswith(path)):
+            continue
+        keys.append(("fetch_seasons", (show_id,)))
+        seasons = _cache.get_index(("show", show_id))
+        keys.extend(("fetch_episodes", (season_id,)) for season_id in seasons)
+
+    _cache.delete(*keys)
+
+
+# Shared HTTP session so keep-alive connections to Plex are reused. The pool
+# blocks when full, so a burst waits for a pooled connection instead of
+# opening extra ones (each with its own TLS handshake) that are then discarded.
+HTTP_POOL_SIZE = 20
+FANOUT_WORKERS = 8
+REQUEST_FANOUT = 4  # executor workers a single request may hold at once
+
+_session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=HTTP_POOL_SIZE,
+    pool_block=True,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+_session.headers.update({"Accept": "application/json", "X-Plex-Token": PLEX_TOKEN})
+
+# Worker pool for fanning out independent Plex requests in parallel
+_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS)
+
+
+def _bounded_map(func, args):
+    """Like Executor.map, but with at most REQUEST_FANOUT calls in flight."""
+    args = iter(args)
+    pending = deque(_executor.submit(func, arg) for arg in islice(args, REQUEST_FANOUT))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            pending.extend(_executor.submit(func, arg) for arg in islice(args, 1))
+            yield result
+    finally:
+        # Consumer stopped early: drop calls that haven't started yet
+        for future in pending:
+            future.cancel()
+
 
-    headers = {"Accept": "application/json"}
+def plex_request(endpoint, params=None, headers=None):
+    """Make a request to the Plex API."""
     url = f"{PLEX_URL}{endpoint}"
 
-    response = requests.get(url, params=params, headers=headers, timeout=30)
+    response = _session.get(url, params=params, headers=headers, timeout=30)
     response.raise_for_status()
-    return response.json()
+    return orjson.loads(response.content)
+
+
+@dataclass(slots=True)
+class Item:
+    """A library item (movie, show, ...) as served to the UI."""
+
+    id: str
+    title: str
+    type: str
+    path: str | None = None
+
+
+@dataclass(slots=True)
+class Episode:
+    """A TV episode as served to the UI."""
+
+    id: str
+    title: str
+    index: int
+    path: str | None = None
+
+
+_item_fields = itemgetter("ratingKey", "title", "type")
+
+
+def _extract_path(item):
+    """Return an item's media file path, or its folder for shows."""
+    try:
+        return item["Media"][0]["Part"][0].get("file", "")
+    except (KeyError, IndexError):
+        location = item.get("Location")
+        return location[0].get("path", "") if location else None
+
+
+def _project_section(section):
+    """Reduce a Plex library section to the fields the UI needs."""
+    return {"id": section["key"], "title": section["title"], "type": section["type"]}
+
+
+def _project_item(item):
+    """Reduce a Plex library item to the fields the UI needs."""
+    key, title, item_type = _item_fields(item)
+    return Item(key, title, item_type, _extract_path(item))
+
+
+def _project_season(season):
+    """Reduce a Plex season to the fields the UI needs."""
+    return {
+        "id": season["ratingKey"],
+        "title": season["title"],
+        "index": season.get("index", 0),
+    }
+
+
+def _project_episode(episode):
+    """Reduce a Plex episode to the fields the UI needs."""
+    return Episode(
+        episode["ratingKey"],
+        episode["title"],
+        episode.get("index", 0),
+        _extract_path(episode),
+    )
+
+
+def _fetch_section_pages(section_id):
+    """Yield a section's containers page by page, fetching later pages in parallel."""
+    endpoint = f"/library/sections/{section_id}/all"
+
+    def fetch_page(start):
+        headers = {
+            "X-Plex-Container-Start": str(start),
+            "X-Plex-Container-Size": str(SECTION_PAGE_SIZE),
+        }
+        return plex_request(endpoint, headers=headers).get("MediaContainer", {})
+
+    first = fetch_page(0)
+    yield first
+
+    total = first.get("totalSize")
+    if total is not None:
+        starts = range(SECTION_PAGE_SIZE, total, SECTION_PAGE_SIZE)
+        yield from _bounded_map(fetch_page, starts)
+        return
+
+    # No total to plan around: keep paging while Plex returns full pages
+    page, start = first, 0
+    while len(page.get("Metadata") or []) == SECTION_PAGE_SIZE:
+        start += SECTION_PAGE_SIZE
+        page = fetch_page(start)
+        yield page
 
 
 @cached()
 def fetch_sections():
     """Fetch and parse library sections (cached)."""
     data = plex_request("/library/sections")
-    sections = []
-    for section in data.get("MediaContainer", {}).get("Directory", []):
-        sections.append({
-            "id": section["key"],
-            "title": section["title"],
-            "type": section["type"],
-        })
-    return sections
+    directories = data.get("MediaContainer", {}).get("Directory") or []
+    return [_project_section(section) for section in directories]
 
 
-@cached()
+def _rebuild_section_items(value):
+    """Turn a section listing decoded from JSON back into Item objects."""
+    value["items"] = [Item(**item) for item in value["items"]]
+    return value
+
+
+def _rebuild_episodes(value):
+    """Turn an episode listing decoded from JSON back into Episode objects."""
+    value["episodes"] = [Episode(**episode) for episode in value["episodes"]]
+    return value
+
+
+@cached(codec=JSONCodec(_rebuild_section_items))
 def fetch_section_items(section_id):
     """Fetch and parse items in a section (cached)."""
-    data = plex_request(f"/library/sections/{section_id}/all")
-    container = data.get("MediaContainer", {})
-    items = []
-
-    for item in container.get("Metadata", []):
-        item_data = {
-            "id": item["ratingKey"],
-            "title": item["title"],
-            "type": item["type"],
-        }
-        if "Media" in item and item["Media"]:
-            parts = item["Media"][0].get("Part", [])
-            if parts:
-                item_data["path"] = parts[0].get("file", "")
-        elif "Location" in item:
-            item_data["path"] = item["Location"][0].get("path", "")
-        items.append(item_data)
+    containers = list(_fetch_section_pages(section_id))
+    items = [
+        _project_item(item)
+        for container in containers
+        for item in container.get("Metadata") or []
+    ]
+    _cache.set_index(
+        ("section", section_id),
+        {item.id: item.path or "" for item in items if item.type == "show"},
+    )
 
     return {
-        "title": container.get("title1", ""),
+        "title": containers[0].get("title1", ""),
         "items": items,
         "section_id": section_id,
     }
 
 
+@cached(codec=RenderedCodec())
+def render_section_items(section_id):
+    """Serialize a section's items and compute their ETag (cached)."""
+    body = orjson.dumps(fetch_section_items(section_id))
+    return body, hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
 @cached()
 def fetch_seasons(show_id):
     """Fetch and parse seasons for a show (cached)."""
     data = plex_request(f"/library/metadata/{show_id}/children")
     container = data.get("MediaContainer", {})
-    seasons = []
-
-    for season in container.get("Metadata", []):
-        seasons.append({
-            "id": season["ratingKey"],
-            "title": season["title"],
-            "index": season.get("index", 0),
-        })
+    metadata = container.get("Metadata") or []
+    seasons = [_project_season(season) for season in metadata]
+    _cache.set_index(("show", show_id), {season["id"]: "" for season in seasons})
 
     return {
         "title": container.get("parentTitle", ""),
@@ -117,24 +519,13 @@ def fetch_seasons(show_id):
     }
 
 
-@cached()
+@cached(codec=JSONCodec(_rebuild_episodes))
 def fetch_episodes(season_id):
     """Fetch and parse episodes in a season (cached)."""
     data = plex_request(f"/library/metadata/{season_id}/children")
     container = data.get("MediaContainer", {})
-    episodes = []
-
-    for episode in container.get("Metadata", []):
-        ep_data = {
-            "id": episode["ratingKey"],
-            "title": episode["title"],
-            "index": episode.get("index", 0),
-        }
-        if "Media" in episode and episode["Media"]:
-            parts = episode["Media"][0].get("Part", [])
-            if parts:
-                ep_data["path"] = parts[0].get("file", "")
-        episodes.append(ep_data)
+    metadata = container.get("Metadata") or []
+    episodes = [_project_episode(episode) for episode in metadata]
 
     return {
         "show_title": container.get("grandparentTitle", ""),
@@ -144,10 +535,69 @@ def fetch_episodes(season_id):
     }
 
 
+def fetch_show_tree(show_id):
+    """Fetch a show's seasons along with their episodes, in parallel."""
+    show = fetch_seasons(show_id)
+    season_ids = [season["id"] for season in show["seasons"]]
+    episodes = _bounded_map(fetch_episodes, season_ids)
+
+    return {
+        "title": show["title"],
+        "seasons": [
+            {**season, "episodes": season_episodes["episodes"]}
+            for season, season_episodes in zip(show["seasons"], episodes)
+        ],
+        "show_id": show_id,
+    }
+
+
+_prefetch_thread = None
+
+
+def _warm_cache():
+    """Periodically re-fetch sections and their items to keep the cache warm."""
+    interval = CACHE_TTL // 2
+    while True:
+        # With a shared cache, only one worker warms it per interval
+        if _cache.acquire_lock("warmer", interval - 1):
+            try:
+                for section in fetch_sections():
+                    fetch_section_items(section["id"])
+            except Exception:
+                # Keep warming on the next pass; routes surface errors to the UI
+                pass
+        time.sleep(interval)
+
+
+def start_prefetch():
+    """Start the background cache warmer when PLEX_PREFETCH=1."""
+    global _prefetch_thread
+    if _prefetch_thread is not None or os.environ.get("PLEX_PREFETCH") != "1":
+        return
+    _prefetch_thread = threading.Thread(target=_warm_cache, daemon=True)
+    _prefetch_thread.start()
+
+
+# The UI is a static page, so load and compress it once at startup
+with open(os.path.join(app.static_folder, "index.html"), "rb") as f:
+    _INDEX_BODY = f.read()
+_INDEX_GZIP = gzip.compress(_INDEX_BODY, 9)
+_INDEX_ETAG = hashlib.blake2b(_INDEX_BODY, digest_size=16).hexdigest()
+
+
 @app.route("/")
 def index():
     """Serve the main UI."""
-    return render_template("index.html")
+    if request.accept_encodings.quality("gzip") > 0:
+        response = Response(_INDEX_GZIP, mimetype="text/html")
+        response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(_INDEX_ETAG + "-gzip")
+    else:
+        response = Response(_INDEX_BODY, mimetype="text/html")
+        response.set_etag(_INDEX_ETAG)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "public, max-age=3600"
+    return response.make_conditional(request)
 
 
 @app.route("/api/sections")
@@ -163,10 +613,38 @@ def get_sections():
 def get_section_items(section_id):
     """Get items in a library section."""
     try:
-        return jsonify(fetch_section_items(section_id))
+        body, etag = render_section_items(section_id)
     except requests.RequestException as e:
         return jsonify({"error": str(e)}), 500
 
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response.make_conditional(request)
+
+
+@app.route("/api/sections/<section_id>/stream")
+def stream_section_items(section_id):
+    """Stream items in a library section as server-sent events."""
+    def generate():
+        try:
+            section = _cache.get(("fetch_section_items", (section_id,)))
+            if section is not _MISSING:
+                for item in section["items"]:
+                    yield b"data: " + orjson.dumps(item) + b"\n\n"
+            else:
+                for container in _fetch_section_pages(section_id):
+                    for item in container.get("Metadata") or []:
+                        yield b"data: " + orjson.dumps(_project_item(item)) + b"\n\n"
+        except requests.RequestException as e:
+            yield b"event: error\ndata: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+            return
+        yield b"event: done\ndata: {}\n\n"
+
+    return Response(
+        generate(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"}
+    )
+
 
 @app.route("/api/shows/<show_id>/seasons")
 def get_seasons(show_id):
@@ -177,6 +655,15 @@ def get_seasons(show_id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/shows/<show_id>/tree")
+def get_show_tree(show_id):
+    """Get all seasons and episodes for a TV show in one request."""
+    try:
+        return jsonify(fetch_show_tree(show_id))
+    except requests.RequestException as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/seasons/<season_id>/episodes")
 def get_episodes(season_id):
     """Get episodes in a season."""
@@ -186,6 +673,52 @@ def get_episodes(season_id):
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/api/prefetch")
+def prefetch():
+    """Get a section's items and every show's seasons in one streamed response."""
+    section_id = request.args.get("section_id")
+    if not section_id:
+        return jsonify({"error": "section_id is required"}), 400
+
+    try:
+        section = fetch_section_items(section_id)
+    except requests.RequestException as e:
+        return jsonify({"error": str(e)}), 500
+
+    show_ids = iter([item.id for item in section["items"] if item.type == "show"])
+
+    def generate():
+        # Keep only a few fetches in flight so other requests still get
+        # executor workers, and emit each show as soon as its seasons arrive
+        pending = {}
+        try:
+            yield b'{"section":' + orjson.dumps(section) + b',"shows":{'
+            first = True
+            while True:
+                for show_id in islice(show_ids, REQUEST_FANOUT - len(pending)):
+                    pending[_executor.submit(fetch_seasons, show_id)] = show_id
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    show_id = pending.pop(future)
+                    try:
+                        seasons = future.result()
+                    except Exception as e:
+                        # The 200 is already sent; report per show, keep going
+                        seasons = {"error": str(e)}
+                    key = orjson.dumps(show_id)
+                    yield (b"" if first else b",") + key + b":" + orjson.dumps(seasons)
+                    first = False
+            yield b"}}"
+        finally:
+            # Client went away: drop fetches that haven't started yet
+            for future in pending:
+                future.cancel()
+
+    return Response(generate(), mimetype="application/json")
+
+
 @app.route("/api/cache/clear", methods=["POST"])
 def clear_cache_endpoint():
     """Clear the API cache."""
@@ -204,16 +737,14 @@ def refresh():
         if not section_id:
             return jsonify({"error": "section_id is required"}), 400
 
-        params = {"X-Plex-Token": PLEX_TOKEN}
-        if path:
-            params["path"] = path
+        params = {"path": path} if path else None
 
         url = f"{PLEX_URL}/library/sections/{section_id}/refresh"
-        response = requests.get(url, params=params, timeout=30)
+        response = _session.get(url, params=params, timeout=30)
         response.raise_for_status()
 
-        # Clear cache so subsequent requests get fresh data
-        clear_cache()
+        # Evict only the refreshed section so other cached data stays warm
+        invalidate_section(str(section_id), path)
 
         return jsonify({"success": True, "message": "Refresh triggered successfully"})
     except requests.RequestException as e:
@@ -227,9 +758,14 @@ if __name__ == "__main__":
     # Re-read after loading .env
     PLEX_URL = os.environ.get("PLEX_URL", "").rstrip("/")
     PLEX_TOKEN = os.environ.get("PLEX_TOKEN", "")
+    _session.headers["X-Plex-Token"] = PLEX_TOKEN
+    REDIS_URL = os.environ.get("REDIS_URL", "")
+    _cache = create_cache()
 
     if not PLEX_URL or not PLEX_TOKEN:
         print("Error: PLEX_URL and PLEX_TOKEN environment variables are required")
         exit(1)
 
-    app.run(debug=True, host="0.0.0.0", port=5000)
+    start_prefetch()
+    debug = os.environ.get("FLASK_ENV") == "development"
+    app.run(debug=debug, host="0.0.0.0", port=5000)
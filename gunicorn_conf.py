@@ -0,0 +1,16 @@
+# Gunicorn settings for production deployments
+# Threads overlap blocking Plex requests. Threads + FANOUT_WORKERS should stay
+# within HTTP_POOL_SIZE in app.py, since the pool blocks once it is exhausted.
+bind = "0.0.0.0:5000"
+workers = 2
+threads = 8
+worker_class = "gthread"
+timeout = 60
+keepalive = 30
+
+
+def post_worker_init(worker):
+    """Start the optional cache warmer once the app is loaded in this worker."""
+    import app
+
+    app.start_prefetch()